@@ -11,22 +11,25 @@ import os
 import json
 import hashlib
 import logging
+import mmap
+from collections import OrderedDict
+from concurrent.futures import (
+    FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
 # Set tokenizers parallelism before importing transformers/sentence-transformers
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
-import pdfplumber
-import pytesseract
-from pdf2image import convert_from_path
-from PIL import Image
-from sentence_transformers import SentenceTransformer
+import numpy as np
+import orjson
 from tqdm import tqdm
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 import warnings
 
+from pdf_extraction import _init_extract_worker, extract_chunks_from_pdf
+
 # Suppress the torch_dtype deprecation warning from sentence-transformers
 warnings.filterwarnings("ignore", message=".*torch_dtype.*is deprecated.*")
 
@@ -47,8 +50,69 @@ MEETINGS_DIR = DOCUMENTS_DIR / 'meetings'
 
 # Embedding model configuration
 EMBEDDING_MODEL = 'jinaai/jina-embeddings-v3'
-CHUNK_SIZE = 1000
-CHUNK_OVERLAP = 200
+BATCH_SIZE = 32  # Chunks per forward pass; higher values risk RAM overload
+ENCODE_TARGET_CHUNKS = 512  # Chunks collected across PDFs per encode call
+EMBEDDING_CACHE_SIZE = 10000  # Embeddings of recent chunk texts reused within a run (~4 KB each)
+
+# Background text extraction (overlaps PDF parsing/OCR with model inference).
+# pdfplumber is pure Python, so extraction runs in worker processes. Defaults
+# to half the cores, leaving the rest to the model and Tesseract's own threads.
+EXTRACT_WORKERS = int(os.getenv('EXTRACT_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+HASH_WORKERS = 4  # Threads for the scan pass (hashlib releases the GIL)
+# Pages of one scanned PDF OCRed concurrently per worker, so all workers
+# together run about one tesseract or pdftoppm process per core
+OCR_PAGE_WORKERS = max(1, (os.cpu_count() or 2) // EXTRACT_WORKERS)
+PREFETCH_FILES = 2 * EXTRACT_WORKERS  # Upper bound on extracted-but-not-yet-embedded PDFs
+CACHE_WRITE_WORKERS = 2  # Threads writing embeddings caches while the model encodes the next batch
+
+# File hashes from earlier runs, reused while a PDF's mtime and size are unchanged
+HASH_CACHE_FILE = Path(__file__).parent / '.hash_cache.json'
+
+# Use the ONNX Runtime export of the model instead of PyTorch
+USE_ONNX = os.getenv('USE_ONNX', 'false').lower() == 'true'
+# Run the ONNX model with int8 dynamically quantized weights
+ONNX_QUANTIZE = os.getenv('ONNX_QUANTIZE', 'false').lower() == 'true'
+
+# Compile the PyTorch model with torch.compile (falls back to eager on failure)
+TORCH_COMPILE = os.getenv('TORCH_COMPILE', 'false').lower() == 'true'
+
+
+def find_pdf_files(root: Path) -> Iterator[str]:
+    """Yield the paths of all PDFs below root.
+
+    os.scandir returns the entry types with the listing, so unlike rglob
+    no Path object or extra stat call is needed for the many cache and
+    metadata files next to the PDFs. A missing root yields nothing.
+    """
+    try:
+        entries = os.scandir(root)
+    except FileNotFoundError:
+        return
+
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from find_pdf_files(entry.path)
+            elif entry.name.endswith('.pdf') and entry.is_file():
+                yield entry.path
+
+
+def start_extract_workers() -> ProcessPoolExecutor:
+    """Create the extraction process pool and start its workers right away.
+
+    Called before the embedding model is loaded, so forked workers neither
+    inherit the model's memory nor fork a process whose torch threads or
+    CUDA context are already running. Spawned workers re-import this
+    script, which is why torch is only imported when the model is loaded.
+    """
+    executor = ProcessPoolExecutor(
+        max_workers=EXTRACT_WORKERS,
+        initializer=_init_extract_worker,
+        initargs=(OCR_PAGE_WORKERS,)
+    )
+    # Workers are otherwise started on the first submissions
+    wait([executor.submit(os.getpid) for _ in range(EXTRACT_WORKERS)])
+    return executor
 
 
 class LocalEmbeddingGenerator:
@@ -57,142 +121,193 @@ class LocalEmbeddingGenerator:
     def __init__(self):
         """Initialize embedding model."""
         print("🚀 Initializing Local Embedding Generator...")
-        
-        # Check for MPS (Apple Silicon GPU) availability
+
+        if USE_ONNX:
+            self._init_onnx_model()
+        else:
+            self._init_torch_model()
+
+        # {relative path: [mtime_ns, size, md5]}
+        self.hash_cache = self._load_hash_cache()
+
+        # {sha1(chunk text): embedding}, least recently used first
+        self.embedding_cache: OrderedDict = OrderedDict()
+
+        print()
+
+    def _init_onnx_model(self):
+        """Load the embedding model into ONNX Runtime."""
+        # Optional dependency, only needed with USE_ONNX=true
+        from onnx_encoder import OnnxEncoder
+
+        print(f"📦 Loading ONNX model: {EMBEDDING_MODEL}{' (int8)' if ONNX_QUANTIZE else ''}")
+        self.model = OnnxEncoder(EMBEDDING_MODEL, quantize=ONNX_QUANTIZE)
+        self.vector_size = self.model.get_sentence_embedding_dimension()
+        print(f"✓ Model loaded ({self.vector_size}D vectors) with {self.model.providers[0]}")
+
+    def _init_torch_model(self):
+        """Load the embedding model with sentence-transformers (PyTorch)."""
+        # Imported here, not at module level: extraction workers started with
+        # spawn (macOS, Windows) re-import this script and would load torch too
         import torch
-        if torch.backends.mps.is_available():
+        from sentence_transformers import SentenceTransformer
+
+        # Check for CUDA or MPS (Apple Silicon GPU) availability
+        if torch.cuda.is_available():
+            device = "cuda"
+            print(f"🎮 Using NVIDIA GPU (CUDA)")
+        elif torch.backends.mps.is_available():
             device = "mps"
             print(f"🎮 Using Apple Silicon GPU (MPS)")
         else:
             device = "cpu"
-            print(f"💻 Using CPU (MPS not available)")
+            print(f"💻 Using CPU (no GPU available)")
+
+        # Let remaining FP32 matmuls use TF32 tensor cores (CUDA only; on CPU
+        # this can switch matmuls to lower-precision kernels)
+        if device == "cuda":
+            torch.set_float32_matmul_precision('high')
 
         # Initialize embedding model
         print(f"📦 Loading model: {EMBEDDING_MODEL}")
-        self.model = SentenceTransformer(EMBEDDING_MODEL, trust_remote_code=True, device=device)
+        # On GPUs load the weights in FP16 right away: halves memory traffic,
+        # runs on tensor cores and never materializes an FP32 copy
+        model_kwargs = {'torch_dtype': torch.float16} if device != "cpu" else {}
+        self.model = SentenceTransformer(
+            EMBEDDING_MODEL,
+            trust_remote_code=True,
+            device=device,
+            model_kwargs=model_kwargs
+        )
         
         # Optimize PyTorch for maximum GPU performance
         if device == "mps":
-            import torch
             # Enable optimized attention and compilation (if supported)
             torch.backends.mps.enable_fallback = False
-            print("🔥 Enabled MPS optimizations for maximum GPU performance")
+            print("🔥 Enabled MPS optimizations, running model in FP16")
+        elif device == "cuda":
+            print("🔥 Running model in FP16 on CUDA")
+
+        if TORCH_COMPILE:
+            self._compile_model()
         
         self.vector_size = self.model.get_sentence_embedding_dimension()
         print(f"✓ Model loaded ({self.vector_size}D vectors) on {device.upper()}")
 
-        # Initialize text splitter
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=CHUNK_SIZE,
-            chunk_overlap=CHUNK_OVERLAP,
-            length_function=len,
-            separators=["\n\n", "\n", ". ", " ", ""]
-        )
+    def _compile_model(self):
+        """Replace the transformer with a torch.compile'd version if it works.
 
-        print()
+        Compilation happens lazily on the first forward pass, so a warm-up
+        encode is run here; on any error the eager model is kept.
+        """
+        import torch
+
+        transformer = self.model[0]
+        eager_model = transformer.auto_model
+        try:
+            # dynamic=True: chunk batches vary in length, avoid one graph per shape
+            transformer.auto_model = torch.compile(eager_model, dynamic=True)
+            self.model.encode(['Warm-up'], task='retrieval.passage', show_progress_bar=False)
+            print("🔥 Compiled model with torch.compile")
+        except Exception as e:
+            transformer.auto_model = eager_model
+            logger.warning(f"torch.compile failed, using eager mode: {e}")
 
-    def _load_folder_metadata(self, folder_path: Path) -> Dict:
-        """Load metadata.json from a paper/meeting folder."""
-        metadata_file = folder_path / 'metadata.json'
-        if not metadata_file.exists():
+    def _load_hash_cache(self) -> Dict[str, list]:
+        """Load file hashes computed by earlier runs."""
+        if not HASH_CACHE_FILE.exists():
             return {}
 
         try:
-            with open(metadata_file, 'r', encoding='utf-8') as f:
+            with open(HASH_CACHE_FILE, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
-            logger.warning(f"Error loading metadata from {metadata_file}: {e}")
+            logger.warning(f"Error loading hash cache from {HASH_CACHE_FILE}: {e}")
             return {}
 
-    def _extract_filename_from_url(self, url: str) -> str:
-        """Extract filename from accessUrl or downloadUrl."""
+    def _save_hash_cache(self):
+        """Write the hash cache, via a temp file so it is never left truncated."""
+        tmp_file = HASH_CACHE_FILE.with_suffix('.tmp')
         try:
-            from urllib.parse import unquote
-            parts = url.split('/')
-            last = parts[-1]
-            # Decode URL-encoded characters
-            filename = unquote(last)
-            # Sanitize filename (remove invalid chars)
-            filename = filename.replace('/', '_').replace('\\', '_').replace(':', '_')
-            return filename
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.hash_cache, f)
+            os.replace(tmp_file, HASH_CACHE_FILE)
         except Exception as e:
-            logger.warning(f"Error extracting filename from URL {url}: {e}")
-            return ''
+            logger.warning(f"Error saving hash cache to {HASH_CACHE_FILE}: {e}")
 
     def _compute_file_hash(self, filepath: Path) -> str:
-        """Compute MD5 hash of file."""
+        """Return the MD5 hash of a file, reusing the cached one if unchanged.
+
+        A file counts as unchanged while its mtime and size match the values
+        recorded when it was last hashed.
+        """
+        stat = filepath.stat()
+        key = os.path.relpath(filepath, DOCUMENTS_DIR)
+
+        cached = self.hash_cache.get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        file_hash = self._hash_file_contents(filepath)
+        self.hash_cache[key] = [stat.st_mtime_ns, stat.st_size, file_hash]
+        return file_hash
+
+    def _hash_file_contents(self, filepath: Path) -> str:
+        """Compute MD5 hash of file.
+
+        The file is memory-mapped and hashed in a single update() call
+        instead of a Python read loop. MD5 is kept on purpose: file_hash is
+        stored in the embeddings caches and in Qdrant payloads.
+        """
         md5 = hashlib.md5()
         with open(filepath, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                md5.update(chunk)
+            # Empty files cannot be memory-mapped
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    md5.update(mm)
         return md5.hexdigest()
 
-    def _extract_text_with_ocr(self, filepath: Path) -> List[tuple[int, str]]:
-        """Extract text from PDF using OCR (fallback for scanned documents)."""
-        try:
-            # Convert PDF pages to images
-            images = convert_from_path(filepath, dpi=300)
-            pages = []
+    def _encode_chunks(self, texts: List[str]) -> np.ndarray:
+        """Encode chunk texts, reusing embeddings of texts seen earlier in this run.
 
-            for i, image in enumerate(images):
-                try:
-                    # Perform OCR with German and English
-                    text = pytesseract.image_to_string(image, lang='deu+eng')
-                    if text and text.strip():
-                        pages.append((i + 1, text))
-                except Exception as page_error:
-                    logger.warning(f"OCR error on page {i+1} of {filepath.name}: {page_error}")
-                    continue
-
-            return pages
-        except Exception as e:
-            logger.error(f"OCR failed for {filepath.name}: {e}")
-            return []
-
-    def _extract_text_from_pdf(self, filepath: Path) -> List[tuple[int, str]]:
-        """Extract text from PDF, returns list of (page_num, text) tuples.
-
-        First tries pdfplumber for text extraction. If no text is found
-        or extraction fails, falls back to OCR for scanned documents.
+        Council documents repeat headers, footers and boilerplate paragraphs.
+        Only texts missing from the LRU cache are sent to the model, each
+        distinct text once, in a single batched call.
         """
-        pages = []
-        use_ocr = False
+        keys = [hashlib.sha1(text.encode('utf-8')).digest() for text in texts]
 
-        # Try pdfplumber first (fast for text-based PDFs)
-        try:
-            # Suppress pdfplumber warnings about malformed PDFs
-            with warnings.catch_warnings():
-                warnings.filterwarnings("ignore", message=".*Cannot set gray.*")
-                warnings.filterwarnings("ignore", message=".*invalid float value.*")
-
-                with pdfplumber.open(filepath) as pdf:
-                    for i, page in enumerate(pdf.pages):
-                        try:
-                            text = page.extract_text()
-                            if text and text.strip():
-                                pages.append((i + 1, text))
-                        except Exception as page_error:
-                            logger.warning(f"Error extracting page {i+1} from {filepath.name}: {page_error}")
-                            continue
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self.embedding_cache:
+                missing.setdefault(key, text)
 
-        except Exception as e:
-            logger.warning(f"pdfplumber failed for {filepath.name}: {e}")
-            use_ocr = True
+        if missing:
+            encoded = self.model.encode(
+                list(missing.values()),
+                task='retrieval.passage',
+                batch_size=BATCH_SIZE,
+                show_progress_bar=False,
+                normalize_embeddings=True,  # Enable normalization on GPU
+                convert_to_tensor=False  # Return as numpy for faster processing
+            )
+            # Rows stay numpy arrays, orjson serializes them without building
+            # a Python float per dimension (fp16 output on CUDA is widened)
+            encoded = encoded.astype(np.float32, copy=False)
+            # Copies, so an entry does not keep the whole batch array alive
+            self.embedding_cache.update((key, row.copy()) for key, row in zip(missing, encoded))
 
-        # Fall back to OCR if no text was extracted
-        if not pages or use_ocr:
-            logger.info(f"Falling back to OCR for {filepath.name} (no text extracted)")
-            pages = self._extract_text_with_ocr(filepath)
+        embeddings = np.stack([self.embedding_cache[key] for key in keys])
 
-        return pages
+        # Mark as recently used, then evict down to the size limit
+        for key in keys:
+            self.embedding_cache.move_to_end(key)
+        while len(self.embedding_cache) > EMBEDDING_CACHE_SIZE:
+            self.embedding_cache.popitem(last=False)
 
-    def _chunk_text(self, text: str) -> List[str]:
-        """Split text into overlapping chunks using LangChain."""
-        chunks = self.text_splitter.split_text(text)
-        return [c.strip() for c in chunks if c.strip()]
+        return embeddings
 
-    def _save_embeddings_cache(self, filepath: Path, file_hash: str, chunks_data: List[Dict]):
-        """Save embeddings to cache file."""
+    def _save_embeddings_cache(self, filepath: Path, file_hash: str, chunks_data: List[Dict]) -> bool:
+        """Save embeddings to cache file, returns False if writing failed."""
         # Use PDF filename (without extension) + .embeddings.json to avoid overwrites
         cache_filename = filepath.stem + '.embeddings.json'
         cache_file = filepath.parent / cache_filename
@@ -203,11 +318,52 @@ class LocalEmbeddingGenerator:
         }
 
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2)
+            # Drop the old sidecar first, so a failed write never leaves a
+            # sidecar vouching for the previous hash next to a new cache
+            hash_file = filepath.parent / (filepath.stem + '.embeddings.hash')
+            hash_file.unlink(missing_ok=True)
+            # Compact output: indentation put every vector component on its
+            # own line and made up a large share of the file size
+            with open(cache_file, 'wb') as f:
+                f.write(orjson.dumps(cache_data, option=orjson.OPT_SERIALIZE_NUMPY))
+            # Written after the cache itself, so it never vouches for a cache
+            # that was not saved
+            self._write_hash_sidecar(filepath, file_hash)
             logger.info(f"Saved embeddings to {cache_file}")
+            return True
         except Exception as e:
             logger.warning(f"Error saving embeddings cache: {e}")
+            return False
+
+    def _write_hash_sidecar(self, filepath: Path, file_hash: str):
+        """Write <stem>.embeddings.hash in md5sum format next to the cache."""
+        hash_file = filepath.parent / (filepath.stem + '.embeddings.hash')
+        hash_file.write_text(f"{file_hash}  {filepath.name}\n", encoding='utf-8')
+
+    def _is_cache_current(self, filepath: Path, file_hash: str) -> bool:
+        """Check whether the embeddings cache matches file_hash.
+
+        Reads the small .embeddings.hash sidecar instead of parsing the whole
+        cache. Caches written before sidecars existed are checked in full
+        once and get their sidecar written.
+        """
+        cache_file = filepath.parent / (filepath.stem + '.embeddings.json')
+        hash_file = filepath.parent / (filepath.stem + '.embeddings.hash')
+
+        if hash_file.exists() and cache_file.exists():
+            try:
+                return hash_file.read_text(encoding='utf-8') == f"{file_hash}  {filepath.name}\n"
+            except Exception as e:
+                logger.warning(f"Error reading {hash_file}: {e}")
+
+        if not self._load_embeddings_cache(filepath, file_hash):
+            return False
+
+        try:
+            self._write_hash_sidecar(filepath, file_hash)
+        except Exception as e:
+            logger.warning(f"Error writing {hash_file}: {e}")
+        return True
 
     def _load_embeddings_cache(self, filepath: Path, file_hash: str) -> Optional[List[Dict]]:
         """Load embeddings from cache if file_hash matches."""
@@ -218,8 +374,8 @@ class LocalEmbeddingGenerator:
             return None
 
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+            with open(cache_file, 'rb') as f:
+                cache_data = orjson.loads(f.read())
 
             # Verify hash matches
             if cache_data.get('file_hash') != file_hash:
@@ -234,82 +390,133 @@ class LocalEmbeddingGenerator:
             logger.warning(f"Error loading embeddings cache: {e}")
             return None
 
-    def process_pdf(self, filepath: Path) -> Optional[bool]:
-        """Process a single PDF file and generate embeddings.
+    def _save_chunks(
+        self,
+        filepath: Path,
+        file_hash: str,
+        chunks: List[Tuple[int, int, str]],
+        embeddings: np.ndarray
+    ) -> bool:
+        """Pair each chunk with its embedding and write the embeddings cache.
+
+        Returns False if the cache could not be written.
+        """
+        chunks_for_cache = [
+            {
+                'page': page_num,
+                'chunk_index': chunk_idx,
+                'text': chunk_text,
+                'vector': embedding
+            }
+            for (page_num, chunk_idx, chunk_text), embedding in zip(chunks, embeddings)
+        ]
+
+        if chunks_for_cache:
+            return self._save_embeddings_cache(filepath, file_hash, chunks_for_cache)
+        return True
+
+    def _encode_pending(
+        self,
+        pending: List[Tuple[Path, str, List[Tuple[int, int, str]]]],
+        cache_writer: Executor
+    ) -> Tuple[List[Future], int]:
+        """Encode the chunks of several PDFs in one call and save each cache.
+
+        Small PDFs alone do not fill a batch; pooling them keeps every
+        forward pass at BATCH_SIZE. The caches are written on cache_writer,
+        so serializing and writing them overlaps with the next encode call;
+        the files are counted once their write finished (see
+        _collect_cache_writes).
+
         Returns:
-            True if skipped (already processed)
-            False if processed successfully
-            None if failed (no text extracted)
+            (cache_write_futures, failed_count)
         """
-        filename = filepath.name
-        folder_path = filepath.parent
+        texts = [text for _, _, chunks in pending for _, _, text in chunks]
+        try:
+            embeddings = self._encode_chunks(texts) if texts else []
+        except Exception as e:
+            logger.error(f"Error encoding {len(pending)} files: {e}")
+            return [], len(pending)
+
+        cache_writes = []
+        offset = 0
+        for pdf_file, file_hash, chunks in pending:
+            cache_writes.append(cache_writer.submit(
+                self._save_chunks, pdf_file, file_hash, chunks, embeddings[offset:offset + len(chunks)]
+            ))
+            offset += len(chunks)
+
+        return cache_writes, 0
 
-        # Compute hash
+    def _collect_cache_writes(self, cache_writes: List[Future]) -> Tuple[int, int]:
+        """Count the finished cache writes and remove them from cache_writes.
+
+        Returns:
+            (processed_count, failed_count)
+        """
+        processed = 0
+        failed = 0
+        remaining = []
+        for future in cache_writes:
+            if not future.done():
+                remaining.append(future)
+            elif future.exception() is not None:
+                logger.error(f"Error saving embeddings cache: {future.exception()}")
+                failed += 1
+            elif future.result():
+                processed += 1
+            else:
+                failed += 1
+        cache_writes[:] = remaining
+        return processed, failed
+
+    def _hash_if_outdated(self, filepath: Path) -> Optional[str]:
+        """Return the PDF's hash if it has no up-to-date embeddings cache, else None."""
         file_hash = self._compute_file_hash(filepath)
+        if self._is_cache_current(filepath, file_hash):
+            return None
+        return file_hash
+
+    def _prefetch_chunks(
+        self,
+        executor: Executor,
+        pdf_files: List[Path]
+    ) -> Iterator[Tuple[Path, Future]]:
+        """Yield (pdf_file, future) pairs as their extraction and chunking finishes.
+
+        At most PREFETCH_FILES extractions are in flight, which bounds the
+        memory held by extracted-but-unembedded text. Files are yielded in
+        completion order, so one slow OCR job does not stall the others.
+        """
+        remaining = iter(pdf_files)
+        in_flight = {}
 
-        # Check if embeddings already exist and are up-to-date
-        cached_chunks = self._load_embeddings_cache(filepath, file_hash)
-        if cached_chunks:
-            return True  # Already processed
-
-        # Load folder metadata
-        folder_metadata = self._load_folder_metadata(folder_path)
-
-        # Extract text
-        pages = self._extract_text_from_pdf(filepath)
-        if not pages:
-            logger.warning(f"No text extracted from {filename}")
-            return None  # Failed
-
-        # Process each page and generate embeddings
-        chunks_for_cache = []
-        all_chunks_text = []
-        chunk_metadata = []
-
-        # First, collect all chunks and their metadata
-        for page_num, page_text in pages:
-            chunks = self._chunk_text(page_text)
-
-            for chunk_idx, chunk_text in enumerate(chunks):
-                if not chunk_text.strip():
-                    continue
-                
-                all_chunks_text.append(chunk_text)
-                chunk_metadata.append({
-                    'page_num': page_num,
-                    'chunk_idx': chunk_idx
-                })
-
-        # Batch encode all chunks at once for better GPU utilization
-        if all_chunks_text:
-            # Increase batch size for better GPU utilization
-            embeddings = self.model.encode(
-                all_chunks_text,
-                task='retrieval.passage',
-                batch_size=32,  # Optimal batch size to avoid RAM overload
-                show_progress_bar=False,
-                normalize_embeddings=True,  # Enable normalization on GPU
-                convert_to_tensor=False  # Return as numpy for faster processing
-            ).tolist()
-
-            # Save for cache - pair each embedding with its metadata
-            for i, (embedding, metadata) in enumerate(zip(embeddings, chunk_metadata)):
-                chunks_for_cache.append({
-                    'page': metadata['page_num'],
-                    'chunk_index': metadata['chunk_idx'],
-                    'text': all_chunks_text[i],
-                    'vector': embedding
-                })
-
-        # Save to cache
-        if chunks_for_cache:
-            self._save_embeddings_cache(filepath, file_hash, chunks_for_cache)
+        def submit_next():
+            pdf_file = next(remaining, None)
+            if pdf_file is not None:
+                in_flight[executor.submit(extract_chunks_from_pdf, pdf_file)] = pdf_file
+
+        for _ in range(PREFETCH_FILES):
+            submit_next()
 
-        return False  # Processed
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                pdf_file = in_flight.pop(future)
+                submit_next()
+                yield pdf_file, future
 
-    def process_all(self):
-        """Process all PDFs in documents directory."""
-        pdf_files = sorted(DOCUMENTS_DIR.rglob('*.pdf'))
+    def process_all(self, extract_executor: Executor):
+        """Process all PDFs in documents directory.
+
+        extract_executor runs the text extraction, see start_extract_workers.
+        """
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as hash_executor:
+            self._process_all(hash_executor, extract_executor)
+
+    def _process_all(self, hash_executor: Executor, extract_executor: Executor):
+        """Scan and process all PDFs, hashing and extracting in the background."""
+        pdf_files = [Path(path) for path in sorted(find_pdf_files(DOCUMENTS_DIR))]
 
         if not pdf_files:
             print(f"⚠ No PDF files found in {DOCUMENTS_DIR}")
@@ -320,15 +527,24 @@ class LocalEmbeddingGenerator:
         # First pass: identify files that need processing
         print("🔍 Checking which files need processing...")
         files_to_process = []
+        file_hashes = {}  # Hashes from the scan, written into the caches
         skipped_count = 0
         
-        for pdf_file in tqdm(pdf_files, desc="Scanning", unit="file"):
-            file_hash = self._compute_file_hash(pdf_file)
-            cached_chunks = self._load_embeddings_cache(pdf_file, file_hash)
-            if cached_chunks:
-                skipped_count += 1
-            else:
+        # Hash files in parallel (hashlib releases the GIL while hashing)
+        scan_results = hash_executor.map(self._hash_if_outdated, pdf_files)
+        for pdf_file, file_hash in tqdm(
+            zip(pdf_files, scan_results), total=len(pdf_files), desc="Scanning", unit="file"
+        ):
+            if file_hash:
                 files_to_process.append(pdf_file)
+                file_hashes[pdf_file] = file_hash
+            else:
+                skipped_count += 1
+
+        # Only keep the files of this scan, dropping deleted or moved PDFs
+        scanned = {os.path.relpath(pdf_file, DOCUMENTS_DIR) for pdf_file in pdf_files}
+        self.hash_cache = {key: value for key, value in self.hash_cache.items() if key in scanned}
+        self._save_hash_cache()
         
         print(f"📊 Analysis complete: {len(files_to_process)} files to process, {skipped_count} already done\n")
 
@@ -340,36 +556,74 @@ class LocalEmbeddingGenerator:
         failed_count = 0
         processed_count = 0
 
-        with tqdm(files_to_process, desc="Processing", unit="file") as pbar:
-            for pdf_file in pbar:
-                try:
-                    # Update progress bar with current file
-                    filename = pdf_file.name[:50] + '...' if len(pdf_file.name) > 50 else pdf_file.name
-
-                    result = self.process_pdf(pdf_file)
+        # Chunked PDFs waiting to be encoded together
+        pending = []
+        pending_chunks = 0
+        # Cache writes not counted yet
+        cache_writes: List[Future] = []
+
+        prefetched = self._prefetch_chunks(extract_executor, files_to_process)
+        # Leaving the block waits for the last cache writes before the summary
+        with ThreadPoolExecutor(max_workers=CACHE_WRITE_WORKERS) as cache_writer, \
+                tqdm(
+                    prefetched, total=len(files_to_process), desc="Processing", unit="file",
+                    mininterval=0.5
+                ) as pbar:
+            for pdf_file, chunks_future in pbar:
+                # Update progress bar with current file
+                filename = pdf_file.name[:50] + '...' if len(pdf_file.name) > 50 else pdf_file.name
 
-                    if result is False:  # Successfully processed
-                        processed_count += 1
-                    elif result is None:  # Failed
+                try:
+                    chunks = chunks_future.result()
+                    if chunks is not None:
+                        pending.append((pdf_file, file_hashes[pdf_file], chunks))
+                        pending_chunks += len(chunks)
+                    else:
+                        logger.warning(f"No text extracted from {pdf_file.name}")
                         failed_count += 1
-
-                    # Update display with current stats
-                    pbar.set_postfix_str(f"Processed: {processed_count} | Failed: {failed_count} | {filename}")
                 except Exception as e:
                     logger.error(f"Error: {pdf_file.name}: {e}")
                     failed_count += 1
 
+                if pending_chunks >= ENCODE_TARGET_CHUNKS:
+                    writes, failed = self._encode_pending(pending, cache_writer)
+                    cache_writes.extend(writes)
+                    failed_count += failed
+                    pending = []
+                    pending_chunks = 0
+
+                processed, failed = self._collect_cache_writes(cache_writes)
+                processed_count += processed
+                failed_count += failed
+
+                # Update display with current stats (drawn with the next refresh)
+                pbar.set_postfix_str(
+                    f"Processed: {processed_count} | Failed: {failed_count} | {filename}", refresh=False
+                )
+
+            if pending:
+                writes, failed = self._encode_pending(pending, cache_writer)
+                cache_writes.extend(writes)
+                failed_count += failed
+
+        # All writes are finished once the cache writer is shut down
+        processed, failed = self._collect_cache_writes(cache_writes)
+        processed_count += processed
+        failed_count += failed
+
         print(f"\n✅ Processing complete!")
         print(f"   Processed: {processed_count}")
         print(f"   Skipped: {skipped_count} (already processed)")
-        print(f"   Failed: {failed_count} (no text extracted)")
+        print(f"   Failed: {failed_count} (no text extracted or errors)")
 
 
 def main():
     """Main entry point."""
     try:
-        generator = LocalEmbeddingGenerator()
-        generator.process_all()
+        # Start the extraction workers before the model is loaded
+        with start_extract_workers() as extract_executor:
+            generator = LocalEmbeddingGenerator()
+            generator.process_all(extract_executor)
     except Exception as e:
         logger.error(f"Fatal error: {e}")
         raise
@@ -12,7 +12,9 @@ client = QdrantClient(
     url=os.getenv('QDRANT_URL'),
     api_key=os.getenv('QDRANT_API_KEY'),
     timeout=30,
-    port=int(os.getenv('QDRANT_PORT', 443))
+    port=int(os.getenv('QDRANT_PORT', 443)),
+    grpc_port=int(os.getenv('QDRANT_GRPC_PORT', 6334)),
+    prefer_grpc=os.getenv('QDRANT_PREFER_GRPC', 'false').lower() == 'true',
 )
 
 # Get a few sample points
@@ -5,9 +5,10 @@ Migration script to rename embeddings.json to <pdf-name>.embeddings.json format.
 This preserves existing embeddings without regenerating them.
 """
 
-import json
 from pathlib import Path
 
+import orjson
+
 DOCUMENTS_DIR = Path(__file__).parent.parent / 'documents'
 
 
@@ -30,8 +31,8 @@ def migrate_embeddings():
     for old_file in old_files:
         try:
             # Read the embeddings file
-            with open(old_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(old_file, 'rb') as f:
+                data = orjson.loads(f.read())
 
             # Get the PDF filename from the data
             pdf_filename = data.get('filename')
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+ONNX Runtime encoder for jina-embeddings-v3
+
+Runs the ONNX export that ships with the model on the Hugging Face Hub and
+mirrors the parts of SentenceTransformer.encode() used by
+generate_embeddings.py (task adapters, mean pooling, L2 normalization).
+Enabled with USE_ONNX=true, ONNX_QUANTIZE=true additionally runs it with
+int8 weights.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import onnxruntime
+from huggingface_hub import snapshot_download
+from transformers import AutoTokenizer, PretrainedConfig
+
+ONNX_MODEL_FILE = 'onnx/model.onnx'
+
+# Quantized models are written once and reused (gitignored)
+QUANTIZED_MODEL_DIR = Path(__file__).parent / 'models'
+
+
+def _select_providers() -> List[str]:
+    """Prefer GPU execution providers, fall back to CPU.
+
+    CoreML (Apple Silicon, onnxruntime builds for macOS) runs the ops it
+    supports on the GPU/Neural Engine; the rest falls back to CPU.
+    """
+    available = onnxruntime.get_available_providers()
+    providers = [p for p in ('CUDAExecutionProvider', 'CoreMLExecutionProvider') if p in available]
+    return providers + ['CPUExecutionProvider']
+
+
+def _quantize_int8(model_name: str, model_path: Path) -> Path:
+    """Return an int8 dynamically quantized copy of the model, creating it once.
+
+    Weights are stored as int8 and activations are quantized at runtime, so
+    no calibration data is needed. ONNX Runtime picks VNNI kernels for the
+    int8 MatMuls on CPUs that have them.
+    """
+    # Imported lazily, only needed with ONNX_QUANTIZE=true
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output_dir = QUANTIZED_MODEL_DIR / f"{model_name.split('/')[-1]}-int8"
+    output_path = output_dir / 'model.onnx'
+    if output_path.exists():
+        return output_path
+
+    print(f"⚙️  Quantizing {model_name} to int8 (one-time)...")
+    # Quantize into a temp dir of this run and rename, so an interrupted or
+    # concurrent run never leaves a partial model at output_dir
+    QUANTIZED_MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=output_dir.name + '.', dir=QUANTIZED_MODEL_DIR))
+    try:
+        quantize_dynamic(
+            str(model_path),
+            str(tmp_dir / 'model.onnx'),
+            weight_type=QuantType.QInt8,
+            use_external_data_format=True
+        )
+        # A directory without the model (e.g. deleted by hand) blocks the rename
+        if output_dir.exists() and not output_path.exists():
+            shutil.rmtree(output_dir)
+        try:
+            os.replace(tmp_dir, output_dir)
+        except OSError:
+            # Another run finished first, reuse its model
+            if not output_path.exists():
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return output_path
+
+
+class OnnxEncoder:
+    """Encodes texts with the ONNX export of jina-embeddings-v3."""
+
+    def __init__(self, model_name: str, quantize: bool = False):
+        """Download the ONNX graph (plus external weights) and open a session.
+
+        With quantize=True the session runs an int8 quantized copy instead.
+        """
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        config = PretrainedConfig.from_pretrained(model_name)
+        self.lora_adaptations = list(config.lora_adaptations)
+        self.hidden_size = config.hidden_size
+        self.max_seq_length = self.tokenizer.model_max_length
+
+        # model.onnx keeps its weights in model.onnx_data next to it
+        model_dir = snapshot_download(model_name, allow_patterns=[f"{ONNX_MODEL_FILE}*"])
+        model_path = Path(model_dir) / ONNX_MODEL_FILE
+        if quantize:
+            model_path = _quantize_int8(model_name, model_path)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.providers = _select_providers()
+        self.session = onnxruntime.InferenceSession(
+            str(model_path),
+            sess_options=options,
+            providers=self.providers
+        )
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """Return the embedding dimension (same as SentenceTransformer)."""
+        return self.hidden_size
+
+    def _encode_batch(self, texts: List[str], task_id: np.ndarray) -> np.ndarray:
+        """Run one padded batch through the model and mean-pool the tokens."""
+        tokens = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors='np'
+        )
+        token_embeddings = self.session.run(None, {
+            'input_ids': tokens['input_ids'],
+            'attention_mask': tokens['attention_mask'],
+            'task_id': task_id,
+        })[0]
+
+        mask = np.expand_dims(tokens['attention_mask'], axis=-1).astype(token_embeddings.dtype)
+        summed = np.sum(token_embeddings * mask, axis=1)
+        counts = np.clip(np.sum(mask, axis=1), a_min=1e-9, a_max=None)
+        return summed / counts
+
+    def encode(
+        self,
+        sentences: List[str],
+        task: Optional[str] = None,
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        normalize_embeddings: bool = False,
+        convert_to_tensor: bool = False
+    ) -> np.ndarray:
+        """Encode sentences, keeping the SentenceTransformer.encode() signature.
+
+        Sentences are sorted by length before batching to minimize padding
+        and returned in input order. show_progress_bar and convert_to_tensor
+        are accepted for compatibility only.
+        """
+        if not sentences:
+            return np.zeros((0, self.hidden_size), dtype=np.float32)
+
+        # The ONNX graph always applies a LoRA adapter, so a task is required
+        if task not in self.lora_adaptations:
+            raise ValueError(f"Unknown task {task!r}, expected one of {self.lora_adaptations}")
+        task_id = np.array(self.lora_adaptations.index(task), dtype=np.int64)
+
+        order = np.argsort([-len(s) for s in sentences], kind='stable')
+        embeddings = np.empty((len(sentences), self.hidden_size), dtype=np.float32)
+
+        for start in range(0, len(sentences), batch_size):
+            batch_idx = order[start:start + batch_size]
+            batch = [sentences[i] for i in batch_idx]
+            embeddings[batch_idx] = self._encode_batch(batch, task_id)
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, ord=2, axis=1, keepdims=True)
+            embeddings /= np.clip(norms, a_min=1e-12, a_max=None)
+
+        return embeddings
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+PDF text extraction and chunking for generate_embeddings.py
+
+Kept free of torch and the embedding model, so the extraction worker
+processes only load what they need.
+"""
+
+import os
+import logging
+import tempfile
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+from dotenv import load_dotenv
+
+import pdfplumber
+import pytesseract
+from pdf2image import convert_from_path
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+# Pages of one scanned PDF converted and OCRed concurrently; extraction
+# workers get their share of the cores via _init_extract_worker
+OCR_PAGE_WORKERS = 4
+
+# Extract text with PDFium first (pypdfium2), pdfplumber becomes the fallback
+USE_PDFIUM = os.getenv('USE_PDFIUM', 'false').lower() == 'true'
+
+
+# Text splitter, module-level so extraction workers can chunk what they extract
+TEXT_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=CHUNK_SIZE,
+    chunk_overlap=CHUNK_OVERLAP,
+    length_function=len,
+    separators=["\n\n", "\n", ". ", " ", ""]
+)
+
+
+def _init_extract_worker(page_workers: int = OCR_PAGE_WORKERS):
+    """Set up an extraction worker process.
+
+    Parallelism comes from the worker processes and their page_workers page
+    threads, so each tesseract subprocess is limited to one OpenMP thread
+    to avoid oversubscribing the CPU.
+    """
+    global OCR_PAGE_WORKERS
+    OCR_PAGE_WORKERS = page_workers
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+
+
+def extract_text_with_ocr(filepath: Path) -> List[tuple[int, str]]:
+    """Extract text from PDF using OCR (fallback for scanned documents)."""
+    try:
+        pages = []
+
+        with tempfile.TemporaryDirectory() as output_folder, \
+                ThreadPoolExecutor(max_workers=OCR_PAGE_WORKERS) as executor:
+            # Convert PDF pages to image files (several pdftoppm processes).
+            # Tesseract reads the files directly, so pages are never held in
+            # memory as PIL images.
+            image_paths = convert_from_path(
+                filepath,
+                dpi=300,
+                output_folder=output_folder,
+                paths_only=True,
+                thread_count=OCR_PAGE_WORKERS
+            )
+
+            # Perform OCR with German and English. Each page runs in its own
+            # tesseract subprocess, so threads overlap them despite the GIL.
+            futures = [
+                executor.submit(pytesseract.image_to_string, image_path, lang='deu+eng')
+                for image_path in image_paths
+            ]
+            for i, future in enumerate(futures):
+                try:
+                    text = future.result()
+                    if text and text.strip():
+                        pages.append((i + 1, text))
+                except Exception as page_error:
+                    logger.warning(f"OCR error on page {i+1} of {filepath.name}: {page_error}")
+                    continue
+
+        return pages
+    except Exception as e:
+        logger.error(f"OCR failed for {filepath.name}: {e}")
+        return []
+
+
+def extract_text_with_pdfium(filepath: Path) -> List[tuple[int, str]]:
+    """Extract text from PDF using PDFium (C++, much faster than pdfminer)."""
+    # Optional dependency, only needed with USE_PDFIUM=true
+    import pypdfium2 as pdfium
+
+    pages = []
+    try:
+        pdf = pdfium.PdfDocument(filepath)
+        try:
+            for i, page in enumerate(pdf):
+                try:
+                    textpage = page.get_textpage()
+                    # PDFium ends lines with \r\n, pdfplumber with \n
+                    text = textpage.get_text_range().replace('\r\n', '\n')
+                    textpage.close()
+                    if text and text.strip():
+                        pages.append((i + 1, text))
+                except Exception as page_error:
+                    logger.warning(f"PDFium error on page {i+1} of {filepath.name}: {page_error}")
+                    continue
+                finally:
+                    page.close()
+        finally:
+            pdf.close()
+    except Exception as e:
+        logger.warning(f"PDFium failed for {filepath.name}: {e}")
+        return []
+
+    return pages
+
+
+def extract_text_from_pdf(filepath: Path) -> List[tuple[int, str]]:
+    """Extract text from PDF, returns list of (page_num, text) tuples.
+
+    First tries pdfplumber for text extraction (PDFium before that with
+    USE_PDFIUM=true). If no text is found or extraction fails, falls back
+    to OCR for scanned documents.
+    Module-level so it can run in ProcessPoolExecutor workers.
+    """
+    if USE_PDFIUM:
+        pages = extract_text_with_pdfium(filepath)
+        if pages:
+            return pages
+
+    pages = []
+    use_ocr = False
+
+    # Try pdfplumber first (fast for text-based PDFs)
+    try:
+        # Suppress pdfplumber warnings about malformed PDFs
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message=".*Cannot set gray.*")
+            warnings.filterwarnings("ignore", message=".*invalid float value.*")
+
+            with pdfplumber.open(filepath) as pdf:
+                for i, page in enumerate(pdf.pages):
+                    try:
+                        text = page.extract_text()
+                        if text and text.strip():
+                            pages.append((i + 1, text))
+                    except Exception as page_error:
+                        logger.warning(f"Error extracting page {i+1} from {filepath.name}: {page_error}")
+                        continue
+
+    except Exception as e:
+        logger.warning(f"pdfplumber failed for {filepath.name}: {e}")
+        use_ocr = True
+
+    # Fall back to OCR if no text was extracted
+    if not pages or use_ocr:
+        logger.info(f"Falling back to OCR for {filepath.name} (no text extracted)")
+        pages = extract_text_with_ocr(filepath)
+
+    return pages
+
+
+def chunk_text(text: str) -> List[str]:
+    """Split text into overlapping chunks using LangChain."""
+    chunks = TEXT_SPLITTER.split_text(text)
+    # Strip each chunk once; the result contains no empty chunks
+    stripped = (c.strip() for c in chunks)
+    return [c for c in stripped if c]
+
+
+def chunk_pages(pages: List[tuple[int, str]]) -> List[Tuple[int, int, str]]:
+    """Split extracted pages into (page_num, chunk_idx, text) tuples."""
+    chunks = []
+    for page_num, page_text in pages:
+        for chunk_idx, text in enumerate(chunk_text(page_text)):
+            chunks.append((page_num, chunk_idx, text))
+    return chunks
+
+
+def extract_chunks_from_pdf(filepath: Path) -> Optional[List[Tuple[int, int, str]]]:
+    """Extract and chunk a PDF in one worker call, None if no text was found.
+
+    Chunking in the worker keeps that CPU work off the main process, which
+    only has to encode, and ships compact chunks back instead of full pages.
+    """
+    pages = extract_text_from_pdf(filepath)
+    if not pages:
+        return None
+    return chunk_pages(pages)
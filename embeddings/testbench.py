@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Qdrant connection and data checks
+
+Replaces the separate test_*.py scripts, so several checks share one
+interpreter (and one qdrant_client import):
+
+    python testbench.py connection
+    python testbench.py inspect query
+    python testbench.py all
+"""
+
+import argparse
+import functools
+import logging
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+QDRANT_URL = os.getenv('QDRANT_URL')
+QDRANT_API_KEY = os.getenv('QDRANT_API_KEY')
+QDRANT_COLLECTION = os.getenv('QDRANT_COLLECTION', 'nordstemmen')
+
+
+@functools.lru_cache(maxsize=None)
+def get_client():
+    """Return a client configured like upload_to_qdrant.py, created once."""
+    # Imported lazily, the httpx check does not need qdrant_client
+    from qdrant_client import QdrantClient
+
+    return QdrantClient(
+        url=QDRANT_URL,
+        api_key=QDRANT_API_KEY,
+        timeout=30,
+        port=int(os.getenv('QDRANT_PORT', 443)),
+        grpc_port=int(os.getenv('QDRANT_GRPC_PORT', 6334)),
+        prefer_grpc=os.getenv('QDRANT_PREFER_GRPC', 'false').lower() == 'true',
+    )
+
+
+def check_connection():
+    """Create a plain client and list the collections."""
+    from qdrant_client import QdrantClient
+
+    print(f"Testing connection to: {QDRANT_URL}")
+    print(f"API Key: {QDRANT_API_KEY[:10]}..." if QDRANT_API_KEY else "No API key")
+
+    try:
+        print("\n1. Creating Qdrant client...")
+        # Plain REST client with default ports, not the uploader's configuration
+        client = QdrantClient(
+            url=QDRANT_URL,
+            api_key=QDRANT_API_KEY,
+            timeout=30,
+        )
+        print("   ✓ Client created")
+
+        print("\n2. Getting collections...")
+        collections = client.get_collections()
+        print(f"   ✓ Success! Collections: {collections}")
+
+    except Exception as e:
+        print(f"   ✗ Error: {type(e).__name__}: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+def inspect_points():
+    """Show what's actually stored in Qdrant."""
+    points = get_client().scroll(
+        collection_name=QDRANT_COLLECTION,
+        limit=5,
+        with_payload=True,
+        with_vectors=False,
+    )
+
+    print(f"Found {len(points[0])} points\n")
+
+    for i, point in enumerate(points[0]):
+        payload = point.payload
+        text = payload.get('text', '')
+        print(f"=== Point {i+1} ===")
+        print(f"File: {payload.get('filename')}")
+        print(f"Page: {payload.get('page')}, Chunk: {payload.get('chunk_index')}")
+        print(f"Text length: {len(text)} chars")
+        print(f"Text: {text[:200]}...")
+        print()
+
+
+def query_collection():
+    """Show collection info and a few sample points with their metadata."""
+    print(f"Connecting to: {QDRANT_URL}")
+    print(f"Collection: {QDRANT_COLLECTION}\n")
+
+    client = get_client()
+
+    # Get collection info
+    info = client.get_collection(QDRANT_COLLECTION)
+    print(f"Collection info:")
+    print(f"  Points count: {info.points_count}")
+    print(f"  Vector size: {info.config.params.vectors.size}")
+    print(f"  Distance: {info.config.params.vectors.distance}\n")
+
+    # Get a few sample points
+    points = client.scroll(
+        collection_name=QDRANT_COLLECTION,
+        limit=3,
+        with_payload=True,
+        with_vectors=False,
+    )
+
+    print(f"Sample points:")
+    for point in points[0]:
+        payload = point.payload
+        print(f"\n  ID: {point.id}")
+        print(f"  File: {payload.get('filename')}")
+        print(f"  Page: {payload.get('page')}, Chunk: {payload.get('chunk_index')}")
+        print(f"  Text preview: {payload.get('text', '')[:100]}...")
+        print(f"  OParl ID: {payload.get('oparl_id')}")
+        print(f"  Date: {payload.get('date')}")
+
+
+def check_httpx():
+    """Test the REST API with plain httpx, bypassing qdrant_client."""
+    import httpx
+
+    print(f"Testing httpx connection to: {QDRANT_URL}")
+    print(f"API Key: {QDRANT_API_KEY[:10]}..." if QDRANT_API_KEY else "No API key")
+
+    # Test 1: Simple GET request
+    print("\n1. Testing simple GET to /")
+    try:
+        response = httpx.get(QDRANT_URL, timeout=30.0)
+        print(f"   ✓ Status: {response.status_code}")
+        print(f"   ✓ Response: {response.text[:100]}")
+    except Exception as e:
+        print(f"   ✗ Error: {type(e).__name__}: {e}")
+
+    # Test 2: GET with API key header
+    print("\n2. Testing GET to /collections with API key")
+    try:
+        response = httpx.get(
+            f"{QDRANT_URL}/collections",
+            headers={"api-key": QDRANT_API_KEY},
+            timeout=30.0
+        )
+        print(f"   ✓ Status: {response.status_code}")
+        print(f"   ✓ Response: {response.text}")
+    except Exception as e:
+        print(f"   ✗ Error: {type(e).__name__}: {e}")
+
+    # Test 3: Using httpx.Client (persistent connection)
+    print("\n3. Testing with httpx.Client")
+    try:
+        with httpx.Client(timeout=30.0) as client:
+            response = client.get(
+                f"{QDRANT_URL}/collections",
+                headers={"api-key": QDRANT_API_KEY}
+            )
+            print(f"   ✓ Status: {response.status_code}")
+            print(f"   ✓ Response: {response.text}")
+    except Exception as e:
+        print(f"   ✗ Error: {type(e).__name__}: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+def check_rest():
+    """Connect with prefer_grpc=False to force HTTP."""
+    from qdrant_client import QdrantClient
+
+    print(f"Testing REST connection to: {QDRANT_URL}")
+    try:
+        client = QdrantClient(
+            url=QDRANT_URL,
+            api_key=QDRANT_API_KEY,
+            timeout=30,
+            prefer_grpc=False,  # Force HTTP instead of gRPC
+        )
+        print("   ✓ Client created")
+
+        collections = client.get_collections()
+        print(f"   ✓ Collections: {collections}")
+    except Exception as e:
+        print(f"   ✗ Error: {type(e).__name__}: {e}")
+
+
+def debug_client():
+    """Dump the client internals and log the requests it sends."""
+    from qdrant_client import QdrantClient
+
+    # Enable debug logging (stays on for the rest of the process, so 'all' runs this last)
+    logging.basicConfig(level=logging.DEBUG)
+
+    print(f"Testing connection to: {QDRANT_URL}")
+    print(f"Creating client...")
+
+    try:
+        client = QdrantClient(
+            url=QDRANT_URL,
+            api_key=QDRANT_API_KEY,
+            timeout=10,  # Shorter timeout for faster feedback
+            prefer_grpc=False,
+        )
+        print("Client created")
+
+        # Try to inspect the client
+        print(f"\nClient type: {type(client._client)}")
+        print(f"Client attributes: {dir(client._client)}")
+
+        if hasattr(client._client, 'http'):
+            print(f"\nHTTP client: {client._client.http}")
+            if hasattr(client._client.http, 'client_impl'):
+                print(f"HTTP impl: {client._client.http.client_impl}")
+
+        print("\nAttempting to get collections...")
+        collections = client.get_collections()
+        print(f"✓ Success! Collections: {collections}")
+
+    except Exception as e:
+        print(f"✗ Error: {type(e).__name__}: {e}")
+
+
+CHECKS = {
+    'connection': check_connection,
+    'inspect': inspect_points,
+    'query': query_collection,
+    'httpx': check_httpx,
+    'rest': check_rest,
+    'debug': debug_client,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('checks', nargs='+', choices=[*CHECKS, 'all'], metavar='check',
+                        help=f"one or more of: {', '.join(CHECKS)}, all")
+    args = parser.parse_args()
+
+    names = list(CHECKS) if 'all' in args.checks else args.checks
+    for name in names:
+        print(f"\n━━━ {name} ━━━")
+        # A failing check does not stop the remaining ones
+        try:
+            CHECKS[name]()
+        except Exception as e:
+            print(f"✗ {name} failed: {type(e).__name__}: {e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,13 +10,23 @@ import os
 import json
 import hashlib
 import logging
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
+from urllib.parse import unquote
 from dotenv import load_dotenv
 
+import numpy as np
+import orjson
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+from qdrant_client.models import (
+    Distance, VectorParams, Filter, FieldCondition, MatchValue,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, HnswConfigDiff,
+    CollectionStatus, OptimizersConfigDiff, PointIdsList, PayloadSchemaType,
+)
 from tqdm import tqdm
 
 # Configure logging (only errors and warnings)
@@ -34,11 +44,81 @@ QDRANT_URL = os.getenv('QDRANT_URL')
 QDRANT_API_KEY = os.getenv('QDRANT_API_KEY')
 QDRANT_PORT = int(os.getenv('QDRANT_PORT', 443))
 QDRANT_COLLECTION = os.getenv('QDRANT_COLLECTION', 'nordstemmen')
+# gRPC is opt-in: the server must expose the gRPC port (not only REST behind the proxy)
+QDRANT_PREFER_GRPC = os.getenv('QDRANT_PREFER_GRPC', 'false').lower() == 'true'
+QDRANT_GRPC_PORT = int(os.getenv('QDRANT_GRPC_PORT', 6334))
 DOCUMENTS_DIR = Path(__file__).parent.parent / 'documents'
 
+# Local copy of the processed-files cache, saves the full scroll on startup
+STATE_FILE = Path(__file__).parent / '.qdrant_state.json'
+
+# Points per upsert request
+UPLOAD_BATCH_SIZE = 128
+
+# Points buffered across files before they are sent to Qdrant. Large
+# flushes keep the per-flush requests (delete, fence) rare; the upsert
+# batches of a flush are still sent back to back without waiting.
+FLUSH_POINTS = 4096
+
+# Flushes sent without waiting before the uploader waits for Qdrant to apply them
+MAX_UNACKED_FLUSHES = 4
+
+# Folders read concurrently (file I/O overlaps; uploads stay one flush at a time)
+UPLOAD_WORKERS = int(os.getenv('UPLOAD_WORKERS', 4))
+
+# Points per scroll page when rebuilding the processed-files cache
+SCROLL_LIMIT = 4096
+
+# Keyword-indexed payload fields (filtering by file, e.g. deleting a changed file's chunks)
+PAYLOAD_INDEX_FIELDS = ('filename', 'file_hash')
+
+# HNSW graph degree once the index is built (Qdrant default)
+HNSW_M = 16
+HNSW_WAIT_TIMEOUT = 1800  # Seconds to wait for the index build before giving up
+HNSW_START_TIMEOUT = 30  # Seconds for the optimizer to pick up the config change
+
+# Skip building the HNSW index, e.g. for intermediate runs of a large bulk load
+SKIP_HNSW_REBUILD = os.getenv('SKIP_HNSW_REBUILD', 'false').lower() == 'true'
+
+# Pause segment indexing while uploading into an already indexed collection,
+# for runs that add many files at once
+BULK_INGEST = os.getenv('BULK_INGEST', 'false').lower() == 'true'
+DEFAULT_INDEXING_THRESHOLD = 20000  # Qdrant default, used if the collection reports none
+
 # Update mode: If true, update metadata for already processed files
 UPDATE_QDRANT_METADATA = os.getenv('UPDATE_QDRANT_METADATA', 'false').lower() == 'true'
 
+# Entity type of a folder, by its top-level directory below DOCUMENTS_DIR
+ENTITY_TYPES = {'papers': 'paper', 'meetings': 'meeting'}
+
+# Metadata fields holding file objects as (key, is_list); the key is stored as file_type
+PAPER_FILE_FIELDS = (('mainFile', False), ('auxiliaryFile', True))
+MEETING_FILE_FIELDS = (('invitation', False), ('resultsProtocol', False))
+AGENDA_ITEM_FILE_FIELDS = (('auxiliaryFile', True),)
+
+# Path separators and ':' in filenames taken from URLs are replaced by '_'
+FILENAME_SANITIZE = str.maketrans({'/': '_', '\\': '_', ':': '_'})
+
+
+def find_metadata_files(root: Path) -> Iterator[str]:
+    """Yield the paths of all metadata.json files below root.
+
+    os.scandir returns the entry types with the listing, so unlike rglob
+    no Path object or extra stat call is needed per file. A missing root
+    yields nothing, like rglob.
+    """
+    try:
+        entries = os.scandir(root)
+    except FileNotFoundError:
+        return
+
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from find_metadata_files(entry.path)
+            elif entry.name == 'metadata.json' and entry.is_file():
+                yield entry.path
+
 
 class QdrantUploader:
     """Uploads pre-generated embeddings to Qdrant using metadata-driven approach."""
@@ -56,15 +136,34 @@ class QdrantUploader:
             url=QDRANT_URL,
             api_key=QDRANT_API_KEY,
             port=QDRANT_PORT,
+            grpc_port=QDRANT_GRPC_PORT,
+            prefer_grpc=QDRANT_PREFER_GRPC,
+            # Batched upserts exceed gRPC's 4 MB default message size
+            grpc_options={'grpc.max_send_message_length': 128 * 1024 * 1024},
             timeout=30,
         )
-        print(f"✓ Connected to Qdrant")
+        print(f"✓ Connected to Qdrant ({'gRPC' if QDRANT_PREFER_GRPC else 'REST'})")
 
         # Ensure collection exists
         self._ensure_collection()
 
         # Load all processed files into memory cache
         self.processed_files_cache = self._load_processed_files_cache()
+
+        # Points waiting for the next flush (ids, float32 vector blocks and
+        # payloads in parallel lists) and the (filename, hash) they belong to,
+        # guarded by pending_lock while folder workers are running
+        self.pending_ids: List[str] = []
+        self.pending_vectors: List[np.ndarray] = []
+        self.pending_payloads: List[Dict] = []
+        self.pending_files: List[Tuple[str, str]] = []
+        self.pending_lock = threading.Lock()
+        # Files of flushes Qdrant has not confirmed as applied yet (see _flush_points)
+        self.unacknowledged_files: List[Tuple[str, str]] = []
+        self.unacknowledged_flushes = 0
+        # Files per outcome of their flush, updated under pending_lock
+        self.uploaded_files = 0
+        self.failed_uploads = 0
         print(f"✓ Loaded {len(self.processed_files_cache)} already-processed files into cache")
 
         if UPDATE_QDRANT_METADATA:
@@ -84,22 +183,199 @@ class QdrantUploader:
                 vectors_config=VectorParams(
                     size=vector_size,
                     distance=Distance.COSINE
+                ),
+                # No HNSW graph during the initial bulk load, it is built
+                # once at the end of upload_all (see _build_hnsw_index)
+                hnsw_config=HnswConfigDiff(m=0),
+                # int8 copy of the vectors kept in RAM for scoring,
+                # originals are used for rescoring. quantile=0.99 clips
+                # outlier components so they don't stretch the int8 range.
+                quantization_config=ScalarQuantization(
+                    scalar=ScalarQuantizationConfig(
+                        type=ScalarType.INT8,
+                        quantile=0.99,
+                        always_ram=True
+                    )
                 )
             )
         else:
             logger.info(f"Collection exists: {QDRANT_COLLECTION}")
 
-    def _load_processed_files_cache(self) -> set:
-        """Load all processed (filename, hash) tuples from Qdrant into memory."""
+        self._ensure_payload_indexes()
+
+    def _ensure_payload_indexes(self):
+        """Create the keyword payload indexes that are missing.
+
+        Without them, deleting by filename has to scan every point's payload.
+        Collections created before this change get the indexes on the next run.
+        """
+        payload_schema = self.client.get_collection(QDRANT_COLLECTION).payload_schema
+        for field_name in PAYLOAD_INDEX_FIELDS:
+            if field_name not in payload_schema:
+                logger.info(f"Creating payload index: {field_name}")
+                self.client.create_payload_index(
+                    collection_name=QDRANT_COLLECTION,
+                    field_name=field_name,
+                    field_schema=PayloadSchemaType.KEYWORD
+                )
+
+    def _build_hnsw_index(self):
+        """Enable the HNSW index if the collection was bulk loaded without it.
+
+        Checks the live config rather than remembering whether this run
+        created the collection, so an interrupted first upload still gets
+        its index on the next run.
+        """
+        hnsw_config = self.client.get_collection(QDRANT_COLLECTION).config.hnsw_config
+        if hnsw_config.m != 0:
+            return
+
+        if SKIP_HNSW_REBUILD:
+            print("⏭️  Skipping HNSW index build (SKIP_HNSW_REBUILD=true)")
+            return
+
+        print("🔧 Building HNSW index...")
+        self.client.update_collection(
+            collection_name=QDRANT_COLLECTION,
+            hnsw_config=HnswConfigDiff(m=HNSW_M)
+        )
+        self._wait_for_optimizers()
+
+    def _wait_for_optimizers(self):
+        """Block until the index build triggered by a config change is done.
+
+        Done means green with every vector indexed (see _is_indexed). Grey
+        means optimizations are pending until the next update, so they are
+        triggered with an empty optimizer config update. A collection that
+        stays green with unindexed vectors (e.g. a segment below the
+        indexing threshold) counts as done once the build was seen running,
+        or after HNSW_START_TIMEOUT.
+        """
+        start = time.monotonic()
+        started = False
+        while True:
+            info = self.client.get_collection(QDRANT_COLLECTION)
+            if info.status == CollectionStatus.GREEN:
+                if started or self._is_indexed(info) or time.monotonic() - start > HNSW_START_TIMEOUT:
+                    break
+            elif info.status == CollectionStatus.GREY:
+                self.client.update_collection(
+                    collection_name=QDRANT_COLLECTION,
+                    optimizers_config=OptimizersConfigDiff()
+                )
+            else:
+                started = True
+            if time.monotonic() - start > HNSW_WAIT_TIMEOUT:
+                logger.warning("Index build still running, continuing without waiting")
+                return
+            time.sleep(5 if started else 1)
+        print("✓ HNSW index ready")
+
+    def _is_indexed(self, info) -> bool:
+        """Check if all vectors are indexed, or the collection is too small to be.
+
+        Qdrant only builds the index for segments above indexing_threshold
+        (KB of vectors); smaller collections are searched by full scan.
+        """
+        points_count = info.points_count or 0
+        vectors_kb = points_count * info.config.params.vectors.size * 4 / 1024
+        threshold = info.config.optimizer_config.indexing_threshold or DEFAULT_INDEXING_THRESHOLD
+        return vectors_kb < threshold or (info.indexed_vectors_count or 0) >= points_count
+
+    def _pause_indexing(self) -> int:
+        """Disable segment indexing and return the threshold to restore afterwards."""
+        optimizer_config = self.client.get_collection(QDRANT_COLLECTION).config.optimizer_config
+        threshold = optimizer_config.indexing_threshold or DEFAULT_INDEXING_THRESHOLD
+        print("⏸️  Indexing paused for bulk ingest (BULK_INGEST=true)")
+        self.client.update_collection(
+            collection_name=QDRANT_COLLECTION,
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=0)
+        )
+        return threshold
+
+    def _resume_indexing(self, threshold: int):
+        """Re-enable segment indexing; Qdrant indexes the new segments in the background."""
+        self.client.update_collection(
+            collection_name=QDRANT_COLLECTION,
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=threshold)
+        )
+        print(f"▶️  Indexing resumed (indexing_threshold={threshold})")
+
+    def _count_points(self) -> int:
+        """Return the exact number of points in the collection."""
+        return self.client.count(collection_name=QDRANT_COLLECTION, exact=True).count
+
+    def _load_state(self) -> Optional[Dict[str, str]]:
+        """Load the processed filename -> hash map from the local state file.
+
+        The state is only trusted if it was written for the same Qdrant
+        instance and collection, and the collection still has the number of
+        points it had when the state was saved. Otherwise returns None.
+        """
+        if not STATE_FILE.exists():
+            return None
+
+        try:
+            with open(STATE_FILE, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+
+            if state.get('url') != QDRANT_URL or state.get('collection') != QDRANT_COLLECTION:
+                return None
+
+            if state.get('points_count') != self._count_points():
+                logger.info("Local state is outdated (points count changed)")
+                return None
+
+            return dict(state.get('files', []))
+        except Exception as e:
+            logger.warning(f"Error loading local state from {STATE_FILE}: {e}")
+            return None
+
+    def _save_state(self):
+        """Write the processed-files cache to the local state file.
+
+        Failures (including the point count request) are only logged: the
+        state is an optimization, the next run falls back to a scroll.
+        """
+        # Write to a temp file and rename, so an interrupted run never
+        # leaves a truncated state file behind
+        tmp_file = STATE_FILE.with_suffix('.tmp')
+        try:
+            state = {
+                'url': QDRANT_URL,
+                'collection': QDRANT_COLLECTION,
+                'points_count': self._count_points(),
+                'files': sorted(self.processed_files_cache.items()),
+            }
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_file, STATE_FILE)
+        except Exception as e:
+            logger.warning(f"Error saving local state to {STATE_FILE}: {e}")
+
+    def _load_processed_files_cache(self) -> Dict[str, str]:
+        """Load the hash each processed file was uploaded with into memory.
+
+        Uses the local state file when it is still valid and falls back to
+        scrolling the whole collection otherwise. A failed scroll raises:
+        a partial cache would let files count as processed that are not.
+        Files found with more than one hash (an older version was not
+        cleaned up) are left out, so they are uploaded and cleaned up again.
+        """
+        processed = self._load_state()
+        if processed is not None:
+            print("🔄 Loaded processed files cache from local state")
+            return processed
+
         print("🔄 Loading processed files cache from Qdrant...")
-        processed = set()
+        hashes: Dict[str, set] = {}
 
         try:
             offset = None
             while True:
                 result = self.client.scroll(
                     collection_name=QDRANT_COLLECTION,
-                    limit=1000,
+                    limit=SCROLL_LIMIT,
                     offset=offset,
                     with_payload=['filename', 'file_hash'],
                     with_vectors=False
@@ -108,139 +384,235 @@ class QdrantUploader:
                 points, next_offset = result
 
                 for point in points:
-                    payload = point.payload
-                    filename = payload.get('filename')
-                    file_hash = payload.get('file_hash')
+                    filename = point.payload.get('filename')
+                    file_hash = point.payload.get('file_hash')
                     if filename and file_hash:
-                        processed.add((filename, file_hash))
+                        hashes.setdefault(filename, set()).add(file_hash)
 
                 if next_offset is None:
                     break
                 offset = next_offset
 
         except Exception as e:
-            logger.warning(f"Error loading processed files cache: {e}")
-
-        return processed
-
-    def _compute_file_hash(self, filepath: Path) -> str:
-        """Compute MD5 hash of file."""
-        md5 = hashlib.md5()
-        with open(filepath, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                md5.update(chunk)
-        return md5.hexdigest()
+            logger.error(f"Error loading processed files cache: {e}")
+            raise
+
+        outdated = [filename for filename, file_hashes in hashes.items() if len(file_hashes) > 1]
+        if outdated:
+            logger.warning(f"{len(outdated)} files have chunks of several versions, uploading them again")
+        return {
+            filename: next(iter(file_hashes))
+            for filename, file_hashes in hashes.items() if len(file_hashes) == 1
+        }
 
     def _is_already_processed(self, filename: str, file_hash: str) -> bool:
         """Check if file with this hash is already in Qdrant."""
-        return (filename, file_hash) in self.processed_files_cache
+        return self.processed_files_cache.get(filename) == file_hash
+
+    def _read_hash_sidecar(self, hash_file: Path, pdf_filename: str) -> Optional[str]:
+        """Return the hash from a <stem>.embeddings.hash sidecar, or None.
+
+        The sidecar is written by generate_embeddings.py in md5sum format
+        ("<hash>  <pdf filename>"). Missing or mismatching sidecars return
+        None, and the caller falls back to the hash inside the cache.
+        """
+        try:
+            file_hash, _, name = hash_file.read_text(encoding='utf-8').rstrip('\n').partition('  ')
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Error reading {hash_file}: {e}")
+            return None
+        return file_hash if name == pdf_filename else None
+
+    def _enqueue_points(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        payloads: List[Dict],
+        filename: str,
+        file_hash: str
+    ):
+        """Buffer the points of one file, flushing once enough have piled up.
+
+        Called from the folder workers; the lock is held during the flush
+        (and its fence), so the other workers keep reading but wait before
+        buffering while Qdrant catches up.
+        """
+        with self.pending_lock:
+            self.pending_ids.extend(ids)
+            self.pending_vectors.append(vectors)
+            self.pending_payloads.extend(payloads)
+            self.pending_files.append((filename, file_hash))
+            if len(self.pending_ids) >= FLUSH_POINTS:
+                self._flush_points()
+
+    def _flush_points(self, wait: bool = False):
+        """Upload all buffered points, fencing every MAX_UNACKED_FLUSHES flushes.
+
+        Uploads and deletes are sent with wait=False: Qdrant acknowledges
+        them once queued, not applied, so uploading overlaps with the server
+        applying the previous flushes. Their files wait in
+        unacknowledged_files until _acknowledge_flushes confirmed they are
+        applied, which bounds the queue on the server and is the only point
+        where files count as uploaded and the local state is saved. With
+        wait=True the flush is always fenced.
+
+        If the upload fails, the whole buffer is counted as failed; those
+        files are missing from the processed cache and are retried on the
+        next run. Chunks that changed files left behind under their previous
+        hash are deleted after the upload, in one request per flush, so a
+        failed upload never leaves a file without points.
+        """
+        if self.pending_ids:
+            # Files not cached under this hash may have chunks of an older
+            # version in the collection (also files missing from the cache,
+            # e.g. after a failed delete), looked up before the cache is updated
+            changed = {
+                filename: file_hash for filename, file_hash in self.pending_files
+                if self.processed_files_cache.get(filename) != file_hash
+            }
+
+            try:
+                # Upload to Qdrant in batches (bounded request size, retried on failure).
+                # Sequential: parallel > 1 starts a new process pool per call and
+                # gives up the ordering the delete below relies on
+                self.client.upload_collection(
+                    collection_name=QDRANT_COLLECTION,
+                    vectors=np.concatenate(self.pending_vectors),
+                    payload=self.pending_payloads,
+                    ids=self.pending_ids,
+                    batch_size=UPLOAD_BATCH_SIZE,
+                    parallel=1,
+                    wait=False
+                )
+            except Exception as e:
+                logger.error(f"Error uploading {len(self.pending_files)} files: {e}")
+                self.failed_uploads += len(self.pending_files)
+            else:
+                sent = self.pending_files
+                # Changed files whose old chunks could not be deleted stay out
+                # of the cache, so the next run retries the delete
+                if changed and not self._delete_old_chunks(changed):
+                    sent = [entry for entry in sent if entry[0] not in changed]
+                    self.failed_uploads += len(self.pending_files) - len(sent)
+                self.unacknowledged_files.extend(sent)
+                self.unacknowledged_flushes += 1
+            finally:
+                self.pending_ids = []
+                self.pending_vectors = []
+                self.pending_payloads = []
+                self.pending_files = []
+
+        if self.unacknowledged_flushes and (wait or self.unacknowledged_flushes >= MAX_UNACKED_FLUSHES):
+            self._acknowledge_flushes()
+        elif wait:
+            self._save_state()
+
+    def _acknowledge_flushes(self):
+        """Wait until the unacknowledged flushes are applied, then mark their files as processed.
+
+        Saves the local state afterwards: its point count then matches what
+        the server has applied, otherwise the next run rejects it. If the
+        wait fails, the files count as failed and are retried on the next
+        run; the error is only logged, so it never masks another one while
+        upload_all is cleaning up.
+        """
+        files = self.unacknowledged_files
+        self.unacknowledged_files = []
+        self.unacknowledged_flushes = 0
+        try:
+            self._wait_for_updates()
+        except Exception as e:
+            logger.error(f"Error waiting for Qdrant to apply {len(files)} files: {e}")
+            self.failed_uploads += len(files)
+            return
+
+        self.processed_files_cache.update(files)
+        self.uploaded_files += len(files)
+        self._save_state()
+
+    def _wait_for_updates(self):
+        """Block until all updates sent so far are applied.
+
+        An empty delete with wait=True is queued behind the earlier updates,
+        so Qdrant only answers once they are applied.
+        """
+        self.client.delete(
+            collection_name=QDRANT_COLLECTION,
+            points_selector=PointIdsList(points=[]),
+            wait=True
+        )
 
-    def _delete_old_chunks(self, filename: str):
-        """Delete old chunks for a file (when file changed)."""
+    def _delete_old_chunks(self, current_hashes: Dict[str, str]) -> bool:
+        """Delete the chunks of changed files that carry another than their current hash.
+
+        Runs after the new chunks were uploaded; matching on the hash keeps
+        them. Returns False if the delete failed.
+        """
         try:
             self.client.delete(
                 collection_name=QDRANT_COLLECTION,
                 points_selector=Filter(
-                    must=[
-                        FieldCondition(
-                            key="filename",
-                            match=MatchValue(value=filename)
+                    should=[
+                        Filter(
+                            must=[FieldCondition(key="filename", match=MatchValue(value=filename))],
+                            must_not=[FieldCondition(key="file_hash", match=MatchValue(value=file_hash))]
                         )
+                        for filename, file_hash in current_hashes.items()
                     ]
-                )
+                ),
+                wait=False
             )
-            logger.info(f"Deleted old chunks for {filename}")
+            logger.info(f"Deleted old chunks for {len(current_hashes)} files")
+            return True
         except Exception as e:
             logger.warning(f"Error deleting old chunks: {e}")
+            return False
 
     def _extract_filename_from_url(self, url: str) -> str:
         """Extract filename from accessUrl or downloadUrl."""
         try:
-            from urllib.parse import unquote
             parts = url.split('/')
             last = parts[-1]
             filename = unquote(last)
-            filename = filename.replace('/', '_').replace('\\', '_').replace(':', '_')
-            return filename
+            return filename.translate(FILENAME_SANITIZE)
         except Exception as e:
             logger.warning(f"Error extracting filename from URL {url}: {e}")
             return ''
 
-    def _get_file_objects_from_paper(self, metadata: Dict) -> List[Dict]:
-        """Extract file objects from paper metadata."""
-        files = []
-
-        # mainFile
-        main_file = metadata.get('mainFile')
-        if isinstance(main_file, dict) and main_file.get('accessUrl'):
-            files.append({
-                'file_type': 'mainFile',
-                'file_id': main_file.get('id', ''),
-                'access_url': main_file.get('accessUrl', ''),
-                'download_url': main_file.get('downloadUrl', ''),
-                'name': main_file.get('name', ''),
-            })
-
-        # auxiliaryFile
-        aux_files = metadata.get('auxiliaryFile', [])
-        if isinstance(aux_files, list):
-            for aux in aux_files:
-                if isinstance(aux, dict) and aux.get('accessUrl'):
-                    files.append({
-                        'file_type': 'auxiliaryFile',
-                        'file_id': aux.get('id', ''),
-                        'access_url': aux.get('accessUrl', ''),
-                        'download_url': aux.get('downloadUrl', ''),
-                        'name': aux.get('name', ''),
-                    })
-
-        return files
-
-    def _get_file_objects_from_meeting(self, metadata: Dict) -> List[Dict]:
-        """Extract file objects from meeting metadata."""
-        files = []
-
-        # invitation
-        invitation = metadata.get('invitation')
-        if isinstance(invitation, dict) and invitation.get('accessUrl'):
-            files.append({
-                'file_type': 'invitation',
-                'file_id': invitation.get('id', ''),
-                'access_url': invitation.get('accessUrl', ''),
-                'download_url': invitation.get('downloadUrl', ''),
-                'name': invitation.get('name', ''),
-            })
+    def _iter_file_objects(self, metadata: Dict, fields: Tuple[Tuple[str, bool], ...]) -> Iterator[Dict]:
+        """Yield the file objects referenced by the given metadata fields.
 
-        # resultsProtocol
-        results_protocol = metadata.get('resultsProtocol')
-        if isinstance(results_protocol, dict) and results_protocol.get('accessUrl'):
-            files.append({
-                'file_type': 'resultsProtocol',
-                'file_id': results_protocol.get('id', ''),
-                'access_url': results_protocol.get('accessUrl', ''),
-                'download_url': results_protocol.get('downloadUrl', ''),
-                'name': results_protocol.get('name', ''),
-            })
+        fields holds (key, is_list) pairs; the key doubles as file_type.
+        Entries without an accessUrl are skipped.
+        """
+        for key, is_list in fields:
+            value = metadata.get(key)
+            if is_list:
+                candidates = value if isinstance(value, list) else []
+            else:
+                candidates = [value]
+
+            for file in candidates:
+                if isinstance(file, dict) and file.get('accessUrl'):
+                    yield {
+                        'file_type': key,
+                        'file_id': file.get('id', ''),
+                        'access_url': file.get('accessUrl', ''),
+                        'download_url': file.get('downloadUrl', ''),
+                        'name': file.get('name', ''),
+                    }
+
+    def _iter_meeting_file_objects(self, metadata: Dict) -> Iterator[Dict]:
+        """Yield the meeting's own files, then the auxiliary files of its agenda items."""
+        yield from self._iter_file_objects(metadata, MEETING_FILE_FIELDS)
 
-        # auxiliaryFile from agendaItems
         agenda_items = metadata.get('agendaItem', [])
         if isinstance(agenda_items, list):
             for item in agenda_items:
-                if not isinstance(item, dict):
-                    continue
-                aux_files = item.get('auxiliaryFile', [])
-                if isinstance(aux_files, list):
-                    for aux in aux_files:
-                        if isinstance(aux, dict) and aux.get('accessUrl'):
-                            files.append({
-                                'file_type': 'auxiliaryFile',
-                                'file_id': aux.get('id', ''),
-                                'access_url': aux.get('accessUrl', ''),
-                                'download_url': aux.get('downloadUrl', ''),
-                                'name': aux.get('name', ''),
-                            })
-
-        return files
+                if isinstance(item, dict):
+                    yield from self._iter_file_objects(item, AGENDA_ITEM_FILE_FIELDS)
 
     def _upload_file_embeddings(
         self,
@@ -252,7 +624,7 @@ class QdrantUploader:
 
         Returns:
             True if skipped (already processed)
-            False if uploaded successfully
+            False if buffered for upload (counted once Qdrant applied it)
             None if failed (no embeddings or error)
         """
         # Extract filename from URL
@@ -270,10 +642,24 @@ class QdrantUploader:
             # No embeddings for this file yet - not an error, just skip
             return None
 
-        # Load embeddings
+        # Check if PDF exists
+        pdf_filepath = folder_path / pdf_filename
+        if not pdf_filepath.exists():
+            logger.warning(f"PDF not found: {pdf_filepath}")
+            return None
+
+        relative_path = str(pdf_filepath.relative_to(DOCUMENTS_DIR))
+
+        # Skip already processed files via the hash sidecar, without parsing the cache
+        if not UPDATE_QDRANT_METADATA:
+            sidecar_hash = self._read_hash_sidecar(folder_path / f"{pdf_stem}.embeddings.hash", pdf_filename)
+            if sidecar_hash and self._is_already_processed(relative_path, sidecar_hash):
+                return True  # Skipped
+
+        # Load embeddings (orjson parses the vector arrays several times faster than json)
         try:
-            with open(embeddings_file, 'r', encoding='utf-8') as f:
-                embeddings_data = json.load(f)
+            with open(embeddings_file, 'rb') as f:
+                embeddings_data = orjson.loads(f.read())
         except Exception as e:
             logger.warning(f"Error loading {embeddings_file}: {e}")
             return None
@@ -285,23 +671,13 @@ class QdrantUploader:
             logger.warning(f"Invalid embeddings data in {embeddings_file}")
             return None
 
-        # Check if PDF exists
-        pdf_filepath = folder_path / pdf_filename
-        if not pdf_filepath.exists():
-            logger.warning(f"PDF not found: {pdf_filepath}")
-            return None
-
-        relative_path = str(pdf_filepath.relative_to(DOCUMENTS_DIR))
-
         # Check if already processed
         already_processed = self._is_already_processed(relative_path, file_hash)
 
         if already_processed and not UPDATE_QDRANT_METADATA:
             return True  # Skipped
 
-        # Delete old chunks if file changed
-        if not already_processed:
-            self._delete_old_chunks(relative_path)
+        # Old chunks of changed files are deleted after the buffer is uploaded
 
         # Build metadata for this file
         file_metadata = {
@@ -312,54 +688,67 @@ class QdrantUploader:
             'pdf_download_url': file_obj.get('download_url', ''),
         }
 
-        # Create points from chunks
-        all_points = []
-        for chunk_data in chunks:
-            chunk_id_string = f"{file_hash}_{chunk_data['page']}_{chunk_data['chunk_index']}"
-            chunk_uuid = str(uuid.uuid5(uuid.NAMESPACE_DNS, chunk_id_string))
-
-            point = PointStruct(
-                id=chunk_uuid,
-                vector=chunk_data['vector'],
-                payload={
-                    'filename': relative_path,
-                    'file_hash': file_hash,
-                    'page': chunk_data['page'],
-                    'chunk_index': chunk_data['chunk_index'],
-                    'text': chunk_data['text'],
-                    **file_metadata
-                }
-            )
-            all_points.append(point)
+        # Point IDs are uuid5(NAMESPACE_DNS, f"{file_hash}_{page}_{chunk_index}").
+        # The SHA-1 state over namespace + file hash is computed once per file
+        # and only the page/chunk suffix is hashed per chunk.
+        id_prefix = hashlib.sha1(uuid.NAMESPACE_DNS.bytes + f"{file_hash}_".encode())
+
+        def chunk_id(page: int, chunk_index: int) -> str:
+            digest = id_prefix.copy()
+            digest.update(f"{page}_{chunk_index}".encode())
+            return str(uuid.UUID(bytes=digest.digest()[:16], version=5))
+
+        # Payload fields shared by all chunks of this file, merged once
+        payload_template = {
+            'filename': relative_path,
+            'file_hash': file_hash,
+            **file_metadata
+        }
 
-        # Upload to Qdrant
-        if all_points:
-            self.client.upsert(
-                collection_name=QDRANT_COLLECTION,
-                points=all_points
-            )
-            self.processed_files_cache.add((relative_path, file_hash))
+        # Create points from chunks. Vectors are kept as one float32 block
+        # (4 KB per point instead of a list of Python floats).
+        try:
+            vectors = np.array([chunk_data['vector'] for chunk_data in chunks], dtype=np.float32)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Invalid vectors in {embeddings_file}: {e}")
+            return None
+
+        ids = [chunk_id(chunk_data['page'], chunk_data['chunk_index']) for chunk_data in chunks]
+        payloads = [
+            {
+                **payload_template,
+                'page': chunk_data['page'],
+                'chunk_index': chunk_data['chunk_index'],
+                'text': chunk_data['text'],
+            }
+            for chunk_data in chunks
+        ]
+
+        self._enqueue_points(ids, vectors, payloads, relative_path, file_hash)
 
         return False  # Processed
 
     def _process_folder(self, metadata_file: Path) -> Tuple[int, int, int]:
         """Process all files in a folder based on its metadata.json.
 
+        Buffered files are counted as uploaded by _acknowledge_flushes.
+
         Returns:
-            (uploaded_count, skipped_count, failed_count)
+            (buffered_count, skipped_count, failed_count)
         """
         folder_path = metadata_file.parent
 
         # Load metadata
         try:
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            with open(metadata_file, 'rb') as f:
+                metadata = orjson.loads(f.read())
         except Exception as e:
             logger.warning(f"Error loading {metadata_file}: {e}")
             return (0, 0, 1)
 
         # Determine entity type
-        entity_type = 'paper' if '/papers/' in str(folder_path) else 'meeting' if '/meetings/' in str(folder_path) else 'unknown'
+        top_level = folder_path.relative_to(DOCUMENTS_DIR).parts[:1]
+        entity_type = ENTITY_TYPES.get(top_level[0] if top_level else '', 'unknown')
 
         # Build base metadata
         base_metadata = {
@@ -379,15 +768,15 @@ class QdrantUploader:
 
         # Get file objects based on entity type
         if entity_type == 'paper':
-            file_objects = self._get_file_objects_from_paper(metadata)
+            file_objects = self._iter_file_objects(metadata, PAPER_FILE_FIELDS)
         elif entity_type == 'meeting':
-            file_objects = self._get_file_objects_from_meeting(metadata)
+            file_objects = self._iter_meeting_file_objects(metadata)
         else:
             logger.warning(f"Unknown entity type for {folder_path}")
             return (0, 0, 1)
 
         # Process each file
-        uploaded = 0
+        buffered = 0
         skipped = 0
         failed = 0
 
@@ -397,16 +786,16 @@ class QdrantUploader:
             if result is True:
                 skipped += 1
             elif result is False:
-                uploaded += 1
+                buffered += 1
             elif result is None:
                 failed += 1
 
-        return (uploaded, skipped, failed)
+        return (buffered, skipped, failed)
 
     def upload_all(self):
         """Upload all embeddings using metadata.json as source of truth."""
         # Find all metadata.json files
-        metadata_files = sorted(DOCUMENTS_DIR.rglob('metadata.json'))
+        metadata_files = [Path(path) for path in sorted(find_metadata_files(DOCUMENTS_DIR))]
 
         if not metadata_files:
             print(f"⚠ No metadata.json files found in {DOCUMENTS_DIR}")
@@ -414,31 +803,56 @@ class QdrantUploader:
 
         print(f"📁 Found {len(metadata_files)} folders with metadata.json\n")
 
-        # Process each folder
-        total_uploaded = 0
+        # Process each folder (uploads are counted by _acknowledge_flushes)
         total_skipped = 0
         total_failed = 0
 
-        with tqdm(metadata_files, desc="Processing", unit="folder") as pbar:
-            for metadata_file in pbar:
-                try:
-                    uploaded, skipped, failed = self._process_folder(metadata_file)
+        indexing_threshold = self._pause_indexing() if BULK_INGEST else None
 
-                    total_uploaded += uploaded
-                    total_skipped += skipped
-                    total_failed += failed
-
-                    # Update display with compact format
-                    pbar.set_postfix(up=total_uploaded, skip=total_skipped, fail=total_failed)
+        executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS)
+        try:
+            futures = {executor.submit(self._process_folder, f): f for f in metadata_files}
+            with tqdm(
+                as_completed(futures), total=len(futures), desc="Processing", unit="folder",
+                mininterval=0.5
+            ) as pbar:
+                for future in pbar:
+                    metadata_file = futures[future]
+                    try:
+                        _, skipped, failed = future.result()
+
+                        total_skipped += skipped
+                        total_failed += failed
+
+                        # Update display with compact format (drawn with the next
+                        # refresh instead of forcing one per folder)
+                        pbar.set_postfix(
+                            up=self.uploaded_files, skip=total_skipped,
+                            fail=total_failed + self.failed_uploads, refresh=False
+                        )
 
-                except Exception as e:
-                    logger.error(f"Error processing {metadata_file}: {e}")
-                    total_failed += 1
+                    except Exception as e:
+                        logger.error(f"Error processing {metadata_file}: {e}")
+                        total_failed += 1
+        finally:
+            # Drop folders that have not started yet if the run is interrupted
+            executor.shutdown(cancel_futures=True)
+            try:
+                # Upload what is buffered even if the run is interrupted (Ctrl+C),
+                # so those files are not re-read on the next run. Waits until
+                # all updates of the run are applied, then saves the state.
+                self._flush_points(wait=True)
+            finally:
+                # Never leave the collection with indexing disabled
+                if indexing_threshold is not None:
+                    self._resume_indexing(indexing_threshold)
+
+        self._build_hnsw_index()
 
         print(f"\n✅ Upload complete!")
-        print(f"   Uploaded: {total_uploaded}")
+        print(f"   Uploaded: {self.uploaded_files}")
         print(f"   Skipped: {total_skipped} (already in Qdrant)")
-        print(f"   Failed: {total_failed} (no embeddings or errors)")
+        print(f"   Failed: {total_failed + self.failed_uploads} (no embeddings or errors)")
 
 
 def main():